@@ -2,7 +2,9 @@ import streamlit as st
 import os
 import shutil
 import zipfile
-from seating_arrangement import ExamSeatingSystem
+import io
+from concurrent.futures import ThreadPoolExecutor
+from seating_arrangement import ExamSeatingSystem, setup_logging
 
 def clean_directory_contents(dir_path):
     """
@@ -23,14 +25,86 @@ def clean_directory_contents(dir_path):
         except Exception as e:
             st.error(f"Failed to delete {file_path}. Reason: {e}")
 
+def _extract_members(open_zip, members):
+    """Worker: copies a share of the archive members using its own ZipFile handle."""
+    with open_zip() as zip_ref:
+        for info, target in members:
+            with zip_ref.open(info) as src, open(target, "wb") as dst:
+                shutil.copyfileobj(src, dst, ZIP_COPY_BUFFER)
+
+def _member_path(dest_dir, info):
+    """
+    Maps a zip member to its path under dest_dir, sanitising the name the
+    same way ZipFile.extractall does: drive letters, absolute roots, '.' and
+    '..' components are stripped, so such members still land inside dest_dir.
+    """
+    arcname = info.filename.replace('/', os.path.sep)
+    if os.path.altsep:
+        arcname = arcname.replace(os.path.altsep, os.path.sep)
+    arcname = os.path.splitdrive(arcname)[1]
+    invalid_parts = ('', os.path.curdir, os.path.pardir)
+    arcname = os.path.sep.join(x for x in arcname.split(os.path.sep) if x not in invalid_parts)
+    return os.path.normpath(os.path.join(dest_dir, arcname))
+
+def extract_zip(zip_source, dest_dir):
+    """
+    Extracts a zip archive (a path or a binary file object) into dest_dir. All target directories are created
+    once up-front and members are copied with a large buffer, which keeps
+    syscalls down for archives holding thousands of small photos.
+    Members are split across a thread pool; zlib releases the GIL while
+    inflating, so the copies overlap.
+    """
+    # ZipFile objects are not safe to share between threads, so every worker opens its own.
+    # Paths are reopened per worker; file objects (e.g. Streamlit uploads) are read into
+    # bytes once, since several ZipFiles seeking one shared handle would interleave reads.
+    if isinstance(zip_source, (str, os.PathLike)):
+        open_zip = lambda: zipfile.ZipFile(zip_source, 'r')
+    else:
+        if hasattr(zip_source, 'getvalue'):
+            data = zip_source.getvalue()
+        else:
+            zip_source.seek(0)
+            data = zip_source.read()
+        open_zip = lambda: zipfile.ZipFile(io.BytesIO(data), 'r')
+
+    with open_zip() as zip_ref:
+        # Keyed by target so that, as with extractall, a later member with the same path wins
+        files = {}
+        dirs = {dest_dir}
+        for info in zip_ref.infolist():
+            target = _member_path(dest_dir, info)
+            if info.is_dir():
+                dirs.add(target)
+            else:
+                dirs.add(os.path.dirname(target))
+                files[target] = info
+
+        for d in dirs:
+            os.makedirs(d, exist_ok=True)
+
+    targets = [(info, target) for target, info in files.items()]
+    workers = min(ZIP_EXTRACT_WORKERS, len(targets))
+    if workers <= 1:
+        _extract_members(open_zip, targets)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_extract_members, open_zip, targets[i::workers]) for i in range(workers)]
+        for future in futures:
+            future.result()
+
 # --- Main App Configuration ---
 
 # Define paths
 DATA_DIR = "data"
 PHOTOS_DIR = os.path.join(DATA_DIR, "photos")
-INPUT_FILE = "input_data.xlsx"
 OUTPUT_DIR = "output"
 MAPPING_FILE = "roll-names-mapping.csv"
+OUTPUT_ZIP = "exam_output.zip"
+ZIP_COPY_BUFFER = 1 << 20
+ZIP_EXTRACT_WORKERS = 8
+
+setup_logging()
 
 # Ensure directories exist
 os.makedirs(PHOTOS_DIR, exist_ok=True)
@@ -58,10 +132,7 @@ if st.button("Generate Seating Plan"):
         clean_directory_contents(OUTPUT_DIR)
         # -------------------------------------------------
 
-        # Save Files
-        with open(INPUT_FILE, "wb") as f:
-            f.write(uploaded_excel.getbuffer())
-            
+        # Save Files (the workbook stays in memory and is handed to load_data directly)
         if uploaded_map:
             with open(MAPPING_FILE, "wb") as f:
                 f.write(uploaded_map.getbuffer())
@@ -69,8 +140,7 @@ if st.button("Generate Seating Plan"):
         # Clean Data dir before extracting (Optional but recommended)
         clean_directory_contents(PHOTOS_DIR)
 
-        with zipfile.ZipFile(uploaded_zip, 'r') as zip_ref:
-            zip_ref.extractall(DATA_DIR)
+        extract_zip(uploaded_zip, DATA_DIR)
             
         st.success("Files uploaded successfully. Processing...")
 
@@ -78,7 +148,7 @@ if st.button("Generate Seating Plan"):
         try:
             sys_obj = ExamSeatingSystem()
             
-            if sys_obj.load_data():
+            if sys_obj.load_data(io.BytesIO(uploaded_excel.getvalue())):
                 # Process Schedule
                 progress_bar = st.progress(0)
                 total_slots = len(sys_obj.schedule)
@@ -86,25 +156,22 @@ if st.button("Generate Seating Plan"):
                 if total_slots == 0:
                     st.warning("No exams found in schedule.")
                 
-                for i, slot in enumerate(sys_obj.schedule):
-                    sys_obj.allocate_session(slot, buffer, mode.lower())
-                    if total_slots > 0:
-                        progress_bar.progress((i + 1) / total_slots)
+                sys_obj.allocate_schedule(buffer, mode.lower(),
+                                          progress=lambda done, total: progress_bar.progress(done / total))
                 
-                # Generate All Reports (Excel + PDFs)
-                sys_obj.generate_excel_reports()
-                sys_obj.generate_attendance_sheets()
+                # Generate All Reports (Excel + PDFs), zipping each file as it is written.
+                # PDFs are already compressed internally, so a low DEFLATE level is enough.
+                with zipfile.ZipFile(OUTPUT_ZIP, 'w', zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+                    sys_obj.generate_excel_reports(archive)
+                    sys_obj.generate_attendance_sheets(archive)
                 
                 st.success("Allocation Complete! PDFs generated.")
 
-                # Zip Output for Download
-                shutil.make_archive("exam_output", 'zip', OUTPUT_DIR)
-                
-                with open("exam_output.zip", "rb") as f:
+                with open(OUTPUT_ZIP, "rb") as f:
                     st.download_button(
                         label="Download All Files (Zip)",
                         data=f,
-                        file_name="exam_output.zip",
+                        file_name=OUTPUT_ZIP,
                         mime="application/zip"
                     )
             else:
@@ -1,13 +1,19 @@
 import pandas as pd
+import xlsxwriter
 import os
+import io
 import logging
 import datetime
+import functools
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Image, Spacer, Flowable
 from reportlab.graphics.shapes import Drawing, Rect, Circle, String
+from reportlab.graphics import renderPDF
 from reportlab.lib.units import inch
+from PIL import Image as PILImage
 
 # ==========================================
 # CONFIGURATION
@@ -17,6 +23,10 @@ CSV_MAPPING_FILE = "roll-names-mapping.csv"
 OUTPUT_DIR = "output"
 LOG_FILE = "errors.txt"
 PHOTOS_DIR = os.path.join("data", "photos")
+PHOTO_THUMB_SIZE = (80, 80)
+
+# Blank lines for hand-filled fields on the attendance sheet
+_U15, _U16 = "_"*15, "_"*16
 
 # Sheet Names
 SHEET_TIMETABLE     = "in_timetable"
@@ -24,17 +34,57 @@ SHEET_COURSE_ROLL   = "in_course_roll_mapping"
 SHEET_ROLL_NAME     = "in_roll_name_mapping"
 SHEET_ROOMS         = "in_room_capacity"
 
-logging.basicConfig(
-    handlers=[logging.FileHandler(LOG_FILE, mode='w'), logging.StreamHandler()],
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+def setup_logging():
+    """
+    Sends logs to LOG_FILE (truncated) and the console. Called explicitly by
+    the entry point rather than at import, so PDF worker processes that
+    re-import this module (spawn/forkserver) don't wipe the parent's log.
+    Only the first call configures anything.
+    """
+    logging.basicConfig(
+        handlers=[logging.FileHandler(LOG_FILE, mode='w'), logging.StreamHandler()],
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+
+# ==========================================
+# PDF STYLES (built once, shared by every sheet)
+# ==========================================
+_TITLE_STYLE  = ParagraphStyle('Title', parent=getSampleStyleSheet()['Heading1'], alignment=1, fontSize=18, spaceAfter=5, fontName='Helvetica-Bold')
+_H_STYLE      = ParagraphStyle('H', fontSize=10, fontName='Helvetica-Bold')
+_DETAIL_STYLE = ParagraphStyle('d', fontSize=9, leading=11)
+_INV_STYLE    = ParagraphStyle('inv', alignment=1, fontSize=10)
+
+_HEADER_TABLE_STYLE = TableStyle([
+    ('BOX', (0,0), (-1,-1), 2, colors.black),
+    ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
+    ('LEFTPADDING', (0,0), (-1,-1), 5),
+    ('BOTTOMPADDING', (0,0), (-1,-1), 8),
+    ('TOPPADDING', (0,0), (-1,-1), 8),
+])
+_CARD_TABLE_STYLE = TableStyle([
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+    ('ALIGN', (0,0), (0,0), 'CENTER'),
+    ('LEFTPADDING', (0,0), (-1,-1), 2),
+    ('RIGHTPADDING', (0,0), (-1,-1), 2),
+])
+_GRID_TABLE_STYLE = TableStyle([
+    ('GRID', (0,0), (-1,-1), 1.5, colors.black),
+    ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
+])
+_MANUAL_TABLE_STYLE = TableStyle([
+    ('GRID', (0,0), (-1,-1), 1, colors.black),
+    ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
+    ('ALIGN', (0,0), (-1,0), 'LEFT'),
+])
 
 # --- Helper: Generate Camera Icon Placeholder ---
+@functools.lru_cache(maxsize=None)
 def get_no_image_drawing(width=55, height=55):
     """
     Creates a vector drawing of a camera inside a box 
     to mimic the 'No Image Available' icon.
+    The drawing is cached per size and shared by every card that needs it.
     """
     d = Drawing(width, height)
     
@@ -65,6 +115,206 @@ def get_no_image_drawing(width=55, height=55):
     
     return d
 
+class NoImageFlowable(Flowable):
+    """
+    Places the 'No Image Available' camera icon. The icon is written into
+    the PDF once as a Form XObject and every card only references it, instead
+    of re-emitting the vector shapes for each student without a photo.
+    """
+    def __init__(self, width=55, height=55):
+        Flowable.__init__(self)
+        self.width = width
+        self.height = height
+        self.form_name = f"noimg_{width}x{height}"
+
+    def wrap(self, availWidth, availHeight):
+        return self.width, self.height
+
+    def draw(self):
+        canv = self.canv
+        if not canv.hasForm(self.form_name):
+            # Pad the BBox so the outer box's stroke, centred on its edge, isn't clipped
+            canv.beginForm(self.form_name, -1, -1, self.width + 1, self.height + 1)
+            renderPDF.draw(get_no_image_drawing(self.width, self.height), canv, 0, 0)
+            canv.endForm()
+        canv.doForm(self.form_name)
+
+def write_xlsx(path, columns, rows):
+    """
+    Streams rows to an .xlsx file with xlsxwriter in constant_memory mode,
+    so only the current row is held in memory. Rows must be written in
+    order, which is why this does not go through DataFrame.to_excel.
+    """
+    workbook = xlsxwriter.Workbook(path, {'constant_memory': True})
+    try:
+        sheet = workbook.add_worksheet()
+        sheet.write_row(0, 0, columns, workbook.add_format({'bold': True}))
+        for i, row in enumerate(rows, start=1):
+            sheet.write_row(i, 0, row)
+    finally:
+        workbook.close()
+
+def _generate_iitp_pdf(filename, exam_meta, students, photo_cache, available_photos):
+    """
+    Builds one attendance sheet PDF. Kept at module level so it can be
+    pickled and run in a worker process; `photo_cache` and `available_photos`
+    only need the entries for the students on this sheet. Each student is a
+    (roll, name, photo_filename) tuple.
+    Returns the PDF bytes so the caller can also add them to the output
+    archive; build errors are raised to the caller.
+    """
+    # Landscape to fit the 3-column layout nicely
+    buf = io.BytesIO()
+    doc = SimpleDocTemplate(buf, pagesize=landscape(A4), 
+                            rightMargin=0.2*inch, leftMargin=0.2*inch, 
+                            topMargin=0.3*inch, bottomMargin=0.3*inch)
+    
+    elements = []
+    
+    # --- 1. Header Section ---
+    elements.append(Paragraph("IITP Attendance System", _TITLE_STYLE))
+    
+    line1 = f"Date: {exam_meta['date']} | Shift: {exam_meta['shift']} | Room No: {exam_meta['room']} | Student count: {exam_meta['count']}"
+    line2 = f"Subject: {exam_meta['subject_name']} | Stud Present: {_U15} | Stud Absent: {_U15}"
+    
+    header_data = [[Paragraph(line1, _H_STYLE)], [Paragraph(line2, _H_STYLE)]]
+    header_table = Table(header_data, colWidths=[10.5*inch])
+    header_table.setStyle(_HEADER_TABLE_STYLE)
+    elements.append(header_table)
+    elements.append(Spacer(1, 0.1*inch))
+
+    # --- 2. Student Grid Section ---
+    
+    def create_student_card(student):
+        roll, name, photo_filename = student
+
+        # Check for photo
+        img_path = os.path.join(PHOTOS_DIR, photo_filename)
+        
+        if roll in photo_cache:
+            img_obj = Image(io.BytesIO(photo_cache[roll]), width=0.8*inch, height=0.8*inch)
+        elif photo_filename in available_photos:
+            img_obj = Image(img_path)
+            img_obj.drawHeight = 0.8 * inch
+            img_obj.drawWidth = 0.8 * inch
+        else:
+            # Use the generated Camera Drawing
+            img_obj = NoImageFlowable(width=55, height=55)
+
+        # Student Details
+        s_name = name[:22] 
+        details_text = f"""
+        <b>{s_name}</b><br/>
+        Roll: {roll}<br/>
+        Sign: {_U16}
+        """
+        details = Paragraph(details_text, _DETAIL_STYLE)
+        
+        # Card: [ Image | Details ]
+        card_data = [[img_obj, details]]
+        card_table = Table(card_data, colWidths=[0.9*inch, 2.2*inch], rowHeights=[0.9*inch])
+        card_table.setStyle(_CARD_TABLE_STYLE)
+        return card_table
+
+    # Batch into 3 columns
+    grid_data = []
+    row_data = []
+    columns = 3
+    
+    for student in students:
+        row_data.append(create_student_card(student))
+        if len(row_data) == columns:
+            grid_data.append(row_data)
+            row_data = []
+    
+    if row_data:
+        while len(row_data) < columns:
+            row_data.append("")
+        grid_data.append(row_data)
+
+    if grid_data:
+        main_table = Table(grid_data, colWidths=[3.5*inch]*columns)
+        main_table.setStyle(_GRID_TABLE_STYLE)
+        elements.append(main_table)
+
+    # --- 3. Footer ---
+    elements.append(Spacer(1, 0.3*inch))
+    elements.append(Paragraph("Invigilator Name & Signature", _INV_STYLE))
+    elements.append(Spacer(1, 0.1*inch))
+    
+    manual_data = [["SI No.", "Name", "Signature"]]
+    for _ in range(3):
+        manual_data.append(["", "", ""])
+        
+    manual_table = Table(manual_data, colWidths=[0.8*inch, 4*inch, 4*inch], rowHeights=[0.3*inch]*4)
+    manual_table.setStyle(_MANUAL_TABLE_STYLE)
+    elements.append(manual_table)
+    
+    # Build errors propagate to the parent, which logs them: workers may
+    # not have logging configured
+    doc.build(elements)
+
+    # Built in memory, then written with a single write() and no fsync: the
+    # sheets can be regenerated, so durability is left to the OS page cache
+    pdf_bytes = buf.getvalue()
+    with open(filename, 'wb') as f:
+        f.write(pdf_bytes)
+    return pdf_bytes
+
+def _allocate_slot(slot_info, rooms, enrollments, buffer, mode):
+    """
+    Seats one exam slot. Pure function of its inputs: `rooms` is a list of
+    (name, capacity) in fill order and `enrollments` maps courses to their
+    sorted rolls; neither is modified.
+    Returns (allocations, room_stats) records for the slot.
+    """
+    courses_sorted = sorted(slot_info['Courses'], key=lambda c: len(enrollments.get(c, ())), reverse=True)
+
+    filled = [0] * len(rooms)
+
+    allocations = []
+    for course in courses_sorted:
+        students = enrollments.get(course, ())
+        if not students: continue
+
+        offset = 0
+        for i, (name, cap) in enumerate(rooms):
+            remaining = len(students) - offset
+            if not remaining: break
+
+            eff_cap = max(0, cap - buffer)
+            subj_limit = eff_cap // 2 if mode == 'sparse' else eff_cap
+            space_in_room = eff_cap - filled[i]
+            take = min(remaining, space_in_room, subj_limit)
+
+            if take > 0:
+                batch = students[offset:offset + take]
+                offset += take
+                filled[i] += take
+                # A room is visited once per course, so this batch is the whole
+                # (room, course) group and the record below is final
+                allocations.append({
+                    'Date': slot_info['Date'],
+                    'IsoDate': slot_info.get('IsoDate', ''),
+                    'Day': slot_info.get('Day', ''),
+                    'Session': slot_info['Session'],
+                    'Course': course,
+                    'Room': name,
+                    'Count': take,
+                    'Students': batch
+                })
+
+    room_stats = []
+    for (name, cap), f in zip(rooms, filled):
+        room_stats.append({
+            'Date': slot_info['Date'],
+            'Session': slot_info['Session'],
+            'Room': name,
+            'Allocated': f,
+            'Free': cap - f
+        })
+    return allocations, room_stats
+
 class ExamSeatingSystem:
     def __init__(self):
         self.schedule = []
@@ -73,6 +323,10 @@ class ExamSeatingSystem:
         self.rooms = []
         self.allocations = []
         self.room_stats = []
+        self._photo_cache = {}
+        self._available_photos = set()
+        self._course_sets = {}
+        self._roll_meta = {}
 
     def clean_text(self, text):
         val = str(text).strip()
@@ -80,16 +334,28 @@ class ExamSeatingSystem:
             return ""
         return val
 
-    def load_data(self):
-        logging.info(f"Reading input file: {INPUT_FILE}...")
+    def clean_column(self, series):
+        """Vectorised clean_text: strips every value and blanks out NaN/'nan'."""
+        vals = series.astype(object).where(series.notna(), "").astype(str).str.strip()
+        return vals.mask(vals.str.lower() == 'nan', "")
+
+    def load_data(self, source=INPUT_FILE):
+        """
+        Loads timetable, enrollments, rooms and names. `source` is a path to
+        the workbook or an already-open binary file object (e.g. an upload
+        held in memory), which is read directly without touching disk.
+        """
+        is_path = isinstance(source, (str, os.PathLike))
+        logging.info(f"Reading input file: {source if is_path else 'in-memory workbook'}...")
         
-        if not os.path.exists(INPUT_FILE):
-            logging.error(f"Input file '{INPUT_FILE}' not found.")
+        if is_path and not os.path.exists(source):
+            logging.error(f"Input file '{source}' not found.")
             return False
 
+        xls = None
         try:
             # 1. LOAD EXCEL DATA
-            xls = pd.ExcelFile(INPUT_FILE)
+            xls = pd.ExcelFile(source)
             
             # --- Timetable ---
             if SHEET_TIMETABLE in xls.sheet_names:
@@ -139,15 +405,11 @@ class ExamSeatingSystem:
                 c_col = next((c for c in df_enrol.columns if 'course' in c), None)
 
                 if r_col and c_col:
-                    for _, row in df_enrol.iterrows():
-                        c_code = self.clean_text(row[c_col])
-                        r_no = self.clean_text(row[r_col])
-                        if c_code and r_no:
-                            if c_code not in self.course_enrollments: self.course_enrollments[c_code] = []
-                            self.course_enrollments[c_code].append(r_no)
-            
-            for c in self.course_enrollments:
-                self.course_enrollments[c].sort()
+                    rolls = self.clean_column(df_enrol[r_col])
+                    codes = self.clean_column(df_enrol[c_col])
+                    valid = (rolls != "") & (codes != "")
+                    # Stored as sorted tuples: immutable, and sliced by offset during allocation
+                    self.course_enrollments = rolls[valid].groupby(codes[valid], sort=False).apply(lambda g: tuple(sorted(g))).to_dict()
 
             # --- Rooms ---
             if SHEET_ROOMS in xls.sheet_names:
@@ -157,13 +419,10 @@ class ExamSeatingSystem:
                 c_col = next((c for c in df_rooms.columns if 'cap' in c), None)
                 
                 if r_col and c_col:
-                    for _, row in df_rooms.iterrows():
-                        self.rooms.append({
-                            'Room': self.clean_text(row[r_col]),
-                            'Capacity': int(row[c_col]) if pd.notna(row[c_col]) else 0,
-                            'filled': 0,
-                            'assignments': {}
-                        })
+                    self.rooms = pd.DataFrame({
+                        'Room': self.clean_column(df_rooms[r_col]),
+                        'Capacity': pd.to_numeric(df_rooms[c_col]).fillna(0).astype(int)
+                    }).to_dict('records')
                     self.rooms.sort(key=lambda x: -x['Capacity'])
 
             # 2. LOAD NAMES (FROM CSV OR EXCEL)
@@ -172,107 +431,116 @@ class ExamSeatingSystem:
                 try:
                     df_csv = pd.read_csv(CSV_MAPPING_FILE)
                     if len(df_csv.columns) >= 2:
-                        for _, row in df_csv.iterrows():
-                            r_val = self.clean_text(row.iloc[0])
-                            n_val = self.clean_text(row.iloc[1])
-                            if r_val: self.student_names[r_val] = n_val
+                        rolls = self.clean_column(df_csv.iloc[:, 0])
+                        names = self.clean_column(df_csv.iloc[:, 1])
+                        valid = rolls != ""
+                        self.student_names.update(zip(rolls[valid], names[valid]))
                 except Exception as e:
                     logging.error(f"Error reading CSV mapping: {e}")
 
             if SHEET_ROLL_NAME in xls.sheet_names:
                 df_names = pd.read_excel(xls, sheet_name=SHEET_ROLL_NAME)
-                for _, row in df_names.iterrows():
-                    if len(row) < 2: continue
-                    r_val = self.clean_text(row.iloc[0])
-                    if r_val and r_val not in self.student_names:
-                        self.student_names[r_val] = self.clean_text(row.iloc[1])
+                if len(df_names.columns) >= 2:
+                    rolls = self.clean_column(df_names.iloc[:, 0])
+                    names = self.clean_column(df_names.iloc[:, 1])
+                    valid = rolls != ""
+                    # CSV names take priority; within the sheet the first entry wins
+                    for r_val, n_val in zip(rolls[valid], names[valid]):
+                        self.student_names.setdefault(r_val, n_val)
+
+            # Roll sets per course, reused by check_clashes for every slot
+            self._course_sets = {c: frozenset(v) for c, v in self.course_enrollments.items()}
+            # (roll, name, photo_filename) per known student, shared by every sheet they appear on
+            self._roll_meta = {r: (r, n, f"{r}.jpg") for r, n in self.student_names.items()}
 
             return True
         except Exception as e:
             logging.error(f"Error loading data: {e}")
             return False
+        finally:
+            if xls is not None: xls.close()
 
     def check_clashes(self, courses_in_slot):
-        seen_students = {}
+        seen_students = set()
         for course in courses_in_slot:
-            students = self.course_enrollments.get(course, [])
-            for roll in students:
-                if roll in seen_students:
-                    return True # Clash found
-                seen_students[roll] = course
+            students = self._course_sets.get(course, frozenset())
+            if not seen_students.isdisjoint(students):
+                return True # Clash found
+            seen_students |= students
         return False
 
     def allocate_session(self, slot_info, buffer, mode):
-        # Reset rooms
-        for r in self.rooms:
-            r['filled'] = 0
-            r['assignments'] = {}
-
-        courses = slot_info['Courses']
-        courses_sorted = sorted(courses, key=lambda c: len(self.course_enrollments.get(c, [])), reverse=True)
-
-        if self.check_clashes(courses):
+        if self.check_clashes(slot_info['Courses']):
             logging.warning(f"Clash detected in slot {slot_info['Date']} {slot_info['Session']}")
             return
 
-        for course in courses_sorted:
-            students = self.course_enrollments.get(course, [])[:]
-            if not students: continue
-
-            for room in self.rooms:
-                if not students: break
-                
-                eff_cap = max(0, room['Capacity'] - buffer)
-                subj_limit = eff_cap // 2 if mode == 'sparse' else eff_cap
-                space_in_room = eff_cap - room['filled']
-                take = min(len(students), space_in_room, subj_limit)
-
-                if take > 0:
-                    batch = students[:take]
-                    students = students[take:]
-                    room['filled'] += take
-                    if course not in room['assignments']: room['assignments'][course] = []
-                    room['assignments'][course].extend(batch)
-
-                    self.allocations.append({
-                        'Date': slot_info['Date'],
-                        'IsoDate': slot_info.get('IsoDate', ''),
-                        'Day': slot_info.get('Day', ''),
-                        'Session': slot_info['Session'],
-                        'Course': course,
-                        'Room': room['Room'],
-                        'Count': take,
-                        'Students': batch
-                    })
-        
-        for r in self.rooms:
-            self.room_stats.append({
-                'Date': slot_info['Date'],
-                'Session': slot_info['Session'],
-                'Room': r['Room'],
-                'Allocated': r['filled'],
-                'Free': r['Capacity'] - r['filled']
-            })
-
-    def generate_excel_reports(self):
+        rooms = [(r['Room'], r['Capacity']) for r in self.rooms]
+        allocations, room_stats = _allocate_slot(slot_info, rooms, self.course_enrollments, buffer, mode)
+        self.allocations.extend(allocations)
+        self.room_stats.extend(room_stats)
+
+    def allocate_schedule(self, buffer, mode, progress=None):
+        """
+        Allocates every slot in the schedule, in order. Slots run serially:
+        each takes well under a millisecond, so a process pool costs more
+        than it saves. `progress(done, total)` is called after each slot.
+        """
+        total = len(self.schedule)
+        for i, slot in enumerate(self.schedule):
+            self.allocate_session(slot, buffer, mode)
+            if progress: progress(i + 1, total)
+
+    def generate_excel_reports(self, archive=None):
         if not self.allocations: return
         
-        data = []
-        for x in self.allocations:
-            data.append([x['Date'], x['Session'], x['Course'], x['Room'], x['Count'], ";".join(x['Students'])])
-        pd.DataFrame(data, columns=["Date", "Session", "Course", "Room", "Count", "Rolls"]).to_excel(os.path.join(OUTPUT_DIR, "overall_seating.xlsx"), index=False)
-        pd.DataFrame(self.room_stats).to_excel(os.path.join(OUTPUT_DIR, "room_stats.xlsx"), index=False)
+        data = ([x['Date'], x['Session'], x['Course'], x['Room'], x['Count'], ";".join(x['Students'])] for x in self.allocations)
+        write_xlsx(os.path.join(OUTPUT_DIR, "overall_seating.xlsx"), ["Date", "Session", "Course", "Room", "Count", "Rolls"], data)
+
+        stat_cols = ["Date", "Session", "Room", "Allocated", "Free"]
+        write_xlsx(os.path.join(OUTPUT_DIR, "room_stats.xlsx"), stat_cols, ([r[c] for c in stat_cols] for r in self.room_stats))
+
+        if archive is not None:
+            for name in ("overall_seating.xlsx", "room_stats.xlsx"):
+                archive.write(os.path.join(OUTPUT_DIR, name), name)
+
+    def load_photo_cache(self):
+        """
+        Decodes every student photo once, shrinks it to card size and keeps
+        the re-encoded bytes in memory, keyed by roll number.
+        """
+        self._photo_cache = {}
+        self._available_photos = set()
+        if not os.path.isdir(PHOTOS_DIR):
+            return
 
-    def generate_attendance_sheets(self):
+        # One listdir replaces a stat() per student per sheet
+        self._available_photos = set(os.listdir(PHOTOS_DIR))
+        for fname in self._available_photos:
+            roll, ext = os.path.splitext(fname)
+            if ext != '.jpg': continue
+            try:
+                with PILImage.open(os.path.join(PHOTOS_DIR, fname)) as img:
+                    img = img.convert('RGB')
+                    img.thumbnail(PHOTO_THUMB_SIZE)
+                    buf = io.BytesIO()
+                    img.save(buf, format='JPEG', quality=85)
+                self._photo_cache[roll] = buf.getvalue()
+            except Exception as e:
+                logging.warning(f"Could not read photo {fname}: {e}")
+
+    def generate_attendance_sheets(self, archive=None):
+        """
+        Builds one attendance PDF per (room, course) allocation. If `archive`
+        (an open zipfile.ZipFile) is given, each PDF is also added to it as
+        soon as it is built, so the output folder never has to be re-read.
+        """
         logging.info("Generating PDF Attendance Sheets...")
+        self.load_photo_cache()
         
-        grouped = {}
+        jobs = []
         for alloc in self.allocations:
-            key = (alloc['IsoDate'], alloc['Date'], alloc.get('Day', ''), alloc['Session'], alloc['Room'], alloc['Course'])
-            if key not in grouped: grouped[key] = []
-            grouped[key].extend(alloc['Students'])
-
-        for (iso_date, disp_date, day, session, room, course), students in grouped.items():
+            iso_date, disp_date, day = alloc['IsoDate'], alloc['Date'], alloc.get('Day', '')
+            session, room, course, students = alloc['Session'], alloc['Room'], alloc['Course'], alloc['Students']
             safe_course = "".join(x for x in course if x.isalnum() or x in " -_")
             filename = os.path.join(OUTPUT_DIR, f"{iso_date}_{session}_{room}_{safe_course}.pdf")
             
@@ -284,121 +552,21 @@ class ExamSeatingSystem:
                 "count": len(students)
             }
             
-            student_objs = []
-            for roll in students:
-                student_objs.append({
-                    "name": self.student_names.get(roll, "Unknown"),
-                    "roll": roll,
-                    "photo_filename": f"{roll}.jpg"
-                })
+            student_objs = [self._roll_meta.get(roll) or (roll, "Unknown", f"{roll}.jpg") for roll in students]
 
-            self._generate_iitp_pdf(filename, exam_meta, student_objs)
+            photos = {roll: self._photo_cache[roll] for roll in students if roll in self._photo_cache}
+            available = {s[2] for s in student_objs if s[2] in self._available_photos}
+            jobs.append((filename, exam_meta, student_objs, photos, available))
 
-    def _generate_iitp_pdf(self, filename, exam_meta, students):
-        # Landscape to fit the 3-column layout nicely
-        doc = SimpleDocTemplate(filename, pagesize=landscape(A4), 
-                                rightMargin=0.2*inch, leftMargin=0.2*inch, 
-                                topMargin=0.3*inch, bottomMargin=0.3*inch)
-        
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # --- 1. Header Section ---
-        title_style = ParagraphStyle('Title', parent=styles['Heading1'], alignment=1, fontSize=18, spaceAfter=5, fontName='Helvetica-Bold')
-        elements.append(Paragraph("IITP Attendance System", title_style))
-        
-        h_style = ParagraphStyle('H', fontSize=10, fontName='Helvetica-Bold')
-        line1 = f"Date: {exam_meta['date']} | Shift: {exam_meta['shift']} | Room No: {exam_meta['room']} | Student count: {exam_meta['count']}"
-        line2 = f"Subject: {exam_meta['subject_name']} | Stud Present: {'_'*15} | Stud Absent: {'_'*15}"
-        
-        header_data = [[Paragraph(line1, h_style)], [Paragraph(line2, h_style)]]
-        header_table = Table(header_data, colWidths=[10.5*inch])
-        header_table.setStyle(TableStyle([
-            ('BOX', (0,0), (-1,-1), 2, colors.black),
-            ('INNERGRID', (0,0), (-1,-1), 0.5, colors.black),
-            ('LEFTPADDING', (0,0), (-1,-1), 5),
-            ('BOTTOMPADDING', (0,0), (-1,-1), 8),
-            ('TOPPADDING', (0,0), (-1,-1), 8),
-        ]))
-        elements.append(header_table)
-        elements.append(Spacer(1, 0.1*inch))
-
-        # --- 2. Student Grid Section ---
-        
-        def create_student_card(student):
-            # Check for photo
-            img_path = os.path.join(PHOTOS_DIR, student.get('photo_filename', ''))
-            
-            if os.path.exists(img_path):
-                img_obj = Image(img_path)
-                img_obj.drawHeight = 0.8 * inch
-                img_obj.drawWidth = 0.8 * inch
-            else:
-                # Use the generated Camera Drawing
-                img_obj = get_no_image_drawing(width=55, height=55)
-
-            # Student Details
-            s_name = student['name'][:22] 
-            details_text = f"""
-            <b>{s_name}</b><br/>
-            Roll: {student['roll']}<br/>
-            Sign: {'_'*16}
-            """
-            details = Paragraph(details_text, ParagraphStyle('d', fontSize=9, leading=11))
-            
-            # Card: [ Image | Details ]
-            card_data = [[img_obj, details]]
-            card_table = Table(card_data, colWidths=[0.9*inch, 2.2*inch], rowHeights=[0.9*inch])
-            card_table.setStyle(TableStyle([
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-                ('ALIGN', (0,0), (0,0), 'CENTER'),
-                ('LEFTPADDING', (0,0), (-1,-1), 2),
-                ('RIGHTPADDING', (0,0), (-1,-1), 2),
-            ]))
-            return card_table
-
-        # Batch into 3 columns
-        grid_data = []
-        row_data = []
-        columns = 3
-        
-        for student in students:
-            row_data.append(create_student_card(student))
-            if len(row_data) == columns:
-                grid_data.append(row_data)
-                row_data = []
-        
-        if row_data:
-            while len(row_data) < columns:
-                row_data.append("")
-            grid_data.append(row_data)
+        if not jobs: return
 
-        if grid_data:
-            main_table = Table(grid_data, colWidths=[3.5*inch]*columns)
-            main_table.setStyle(TableStyle([
-                ('GRID', (0,0), (-1,-1), 1.5, colors.black),
-                ('VALIGN', (0,0), (-1,-1), 'MIDDLE'),
-            ]))
-            elements.append(main_table)
-
-        # --- 3. Footer ---
-        elements.append(Spacer(1, 0.3*inch))
-        elements.append(Paragraph("Invigilator Name & Signature", ParagraphStyle('inv', alignment=1, fontSize=10)))
-        elements.append(Spacer(1, 0.1*inch))
-        
-        manual_data = [["SI No.", "Name", "Signature"]]
-        for _ in range(3):
-            manual_data.append(["", "", ""])
-            
-        manual_table = Table(manual_data, colWidths=[0.8*inch, 4*inch, 4*inch], rowHeights=[0.3*inch]*4)
-        manual_table.setStyle(TableStyle([
-            ('GRID', (0,0), (-1,-1), 1, colors.black),
-            ('FONTNAME', (0,0), (-1,0), 'Helvetica-Bold'),
-            ('ALIGN', (0,0), (-1,0), 'LEFT'),
-        ]))
-        elements.append(manual_table)
-        
-        try:
-            doc.build(elements)
-        except Exception as e:
-            logging.error(f"Failed to build PDF {filename}: {e}")
\ No newline at end of file
+        # Each sheet is independent and CPU-bound in ReportLab layout, so build them in parallel
+        with ProcessPoolExecutor(max_workers=min(len(jobs), os.cpu_count() or 1)) as pool:
+            futures = {pool.submit(_generate_iitp_pdf, *job): job[0] for job in jobs}
+            for future in as_completed(futures):
+                try:
+                    pdf_bytes = future.result()
+                    if archive is not None:
+                        archive.writestr(os.path.basename(futures[future]), pdf_bytes)
+                except Exception as e:
+                    logging.error(f"Failed to build PDF {futures[future]}: {e}")